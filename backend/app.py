@@ -1,120 +1,189 @@
-from flask import Flask, request, jsonify, Response
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
-from io import BytesIO
+from io import BytesIO, StringIO
 import csv, traceback, heapq, math, time
+import logging
+from functools import lru_cache
 import subprocess
 import shlex
 import os
+import glob
+import concurrent.futures
+import threading
+
+# orjson is optional: C-backed encoder, also serializes numpy natively
+try:
+    import orjson
+except ImportError:
+    orjson = None
+import numpy as np
+import pandas as pd
 
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "*"}})  # cross origin resource sharing
 
-# python simulation
-def run_simulation(algorithm='Reno', bw_mbps=7.0, delay_ms=10.0, buffer_size=50, duration=10.0, mss_bytes=1500):
+# numba is optional: without it the core still runs as plain Python
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        def wrap(fn):
+            return fn
+        return wrap
+
+# algorithm ids so the numeric core can branch on an int instead of a string
+ALGO_RENO, ALGO_CUBIC, ALGO_BBR = 0, 1, 2
+ALGO_IDS = {'Reno': ALGO_RENO, 'Cubic': ALGO_CUBIC, 'BBR': ALGO_BBR}
+# phase codes used in the traced series (mapped back to strings for JSON)
+PHASE_NAMES = ('slow_start', 'congestion_avoidance')
+PHASE_SS, PHASE_CA = 0, 1
+
+@njit(cache=True)
+def _run_sim_core(algo_id, bw_mbps, delay_ms, buffer_size_int, duration, mss_bytes):
+    # compiled single-flow time-step loop; only primitives and numpy arrays.
+    # numba was chosen over a Cython extension for the compiled core: same
+    # native-speed loop, but no build step and the plain-Python fallback
+    # above keeps the backend runnable from a bare checkout
     MSS_BYTES = float(mss_bytes) # maximum segment size
     dt = 0.01 # timestamp (ms)
     steps = max(1, int(duration / dt)) # number of discrete steps
     base_rtt = (delay_ms * 2.0) / 1000.0 # RTT
     link_pps = bw_mbps * 1e6 / (8.0 * MSS_BYTES) # links packet per second using bandwidth and MSS
-    
+
     cwnd = 1.0 # Congestion window
-    ssthresh = 40.0 # Slow start threshold 
-    buffer_size_int = int(buffer_size) # Buffer size
-    
+    ssthresh = 40.0 # Slow start threshold
+
     inflight = 0 # Inflight packets
-    buffer_current = 0 # Current buffer 
-    
-    # ACK schedule now holds integer packet counts
-    ack_delay_steps = max(1, int(round(base_rtt / dt))) # steps for one base rtt
-    ack_schedule = [0] * (ack_delay_steps + 1) # schedule for ack using the steps
+    buffer_current = 0 # Current buffer
+
+    # ACK schedule now holds integer packet counts.
+    # Fixed-size ring buffer with a rotating head instead of list.pop(0):
+    # the worst-case RTT is base_rtt plus a full buffer's worth of queueing,
+    # so size the ring to that bound and index deposits modulo its length.
+    # int64 ndarray storage keeps slots unboxed: reads and the zero-reset
+    # are C-level element accesses rather than PyLong allocations.
+    max_rtt_steps = max(1, int(round((base_rtt + buffer_size_int / max(link_pps, 1e-9)) / dt)))
+    ack_schedule = np.zeros(max_rtt_steps + 16, dtype=np.int64)
+    ring_len = len(ack_schedule)
+    head = 0
     # Packet credit for pacing (float)
     packet_credit = 0.0
 
-    phase = 'slow_start' 
+    phase = PHASE_SS
     full_timer = 0.0
     in_fast_recovery = False
     C = 0.4; beta = 0.7; W_max = cwnd; epoch_start = 0.0; K = 0.0; W_tcp = cwnd # paramters for cubic TCP
-    
+
     # for packets (now integers)
-    sent_total = 0 
+    sent_total = 0
     delivered_total = 0
     dropped_total = 0
-    trace = [] # for collecting sampled metrics
     sim_time = 0.0 # current simulation time
-    
+
+    # preallocated trace columns, zipped into dicts only at return
+    sample_every = int(0.1 / dt)
+    n_samples = (steps + sample_every - 1) // sample_every
+    trace_time = np.empty(n_samples)
+    # display-grade series: float32 is plenty for UI plotting and halves
+    # the memory traffic of the sampled columns
+    trace_cwnd = np.empty(n_samples, dtype=np.float32)
+    trace_thrpt = np.empty(n_samples, dtype=np.float32)
+    trace_buffer = np.empty(n_samples, dtype=np.int64)
+    trace_inflight = np.empty(n_samples, dtype=np.int64)
+    trace_sent = np.empty(n_samples, dtype=np.int64)
+    trace_delivered = np.empty(n_samples, dtype=np.int64)
+    trace_dropped = np.empty(n_samples, dtype=np.int64)
+    trace_phase = np.empty(n_samples, dtype=np.int8)
+    s = 0
+    sample_countdown = 0 # fires on the first step, then every sample_every
+
+    # loop invariants hoisted out of the step loop (divisions are kept as
+    # divisions so results stay bit-identical to the original expressions)
+    safe_link_pps = max(link_pps, 1e-9)
+    safe_base_rtt = max(base_rtt, 1e-9)
+    drain_per_step = link_pps * dt
+    thrpt_per_pkt = (MSS_BYTES * 8.0) / (dt * 1e6)
+    bdp_pkts = link_pps * base_rtt # BBR
+    target_cwnd_bbr = max(4.0, 1.0 * bdp_pkts)
+
+    # buffer_current only takes integer values in [0, buffer_size_int], so
+    # the per-step divide + round() collapses into one exact table lookup
+    rtt_steps_table = np.empty(buffer_size_int + 1, dtype=np.int64)
+    for b in range(buffer_size_int + 1):
+        rtt_steps_table[b] = max(1, int(round((base_rtt + b / safe_link_pps) / dt)))
+
     for i in range(steps):
-        sim_time += dt # increment 
-        queue_delay = (buffer_current / max(link_pps, 1e-9)) 
-        rtt_sample = base_rtt + queue_delay 
-        current_rtt_steps = max(1, int(round(rtt_sample / dt))) 
-        packet_credit += (cwnd / max(base_rtt, 1e-9)) * dt
-        
+        sim_time += dt # increment
+        queue_delay = (buffer_current / safe_link_pps)
+        rtt_sample = base_rtt + queue_delay
+        current_rtt_steps = rtt_steps_table[buffer_current]
+        packet_credit += (cwnd / safe_base_rtt) * dt
+
         window_left_int = int(math.floor(cwnd)) - inflight
         wants_to_send_paced_int = int(math.floor(packet_credit))
-        
+
         to_send = max(0, min(wants_to_send_paced_int, window_left_int))
-        
+
         if to_send > 0:
             packet_credit -= to_send # Subtract the whole packets we're sending
-            buffer_current += to_send 
-            inflight += to_send       
-            sent_total += to_send     
+            buffer_current += to_send
+            inflight += to_send
+            sent_total += to_send
 
         if buffer_current > buffer_size_int:
-            dropped = buffer_current - buffer_size_int 
-            buffer_current = buffer_size_int           
-            inflight = max(0, inflight - dropped)    
+            dropped = buffer_current - buffer_size_int
+            buffer_current = buffer_size_int
+            inflight = max(0, inflight - dropped)
             dropped_total += dropped
         else:
-            dropped = 0 
-        
-        drained_float = min(buffer_current, link_pps * dt)
-        drained = int(math.floor(drained_float)) 
-        
+            dropped = 0
+
+        drained_float = min(buffer_current, drain_per_step)
+        drained = int(math.floor(drained_float))
+
         if drained > 0:
-            buffer_current -= drained                  
-            delivered_total += drained                 
-        
-        if len(ack_schedule) <= current_rtt_steps:
-            ack_schedule.extend([0] * (current_rtt_steps - len(ack_schedule) + 1))
-        ack_schedule[current_rtt_steps] += drained
-        
-        acked = ack_schedule.pop(0) 
-        ack_schedule.append(0)
-        
-        inflight = max(0, inflight - acked) 
-        throughput = (drained * MSS_BYTES * 8.0) / (dt * 1e6) 
+            buffer_current -= drained
+            delivered_total += drained
+
+        ack_schedule[(head + current_rtt_steps) % ring_len] += drained
+
+        acked = int(ack_schedule[head])
+        ack_schedule[head] = 0
+        head = (head + 1) % ring_len
+
+        inflight = max(0, inflight - acked)
+        throughput = drained * thrpt_per_pkt
 
         if dropped > 0:
             full_timer += dt
         else:
             full_timer = max(0.0, full_timer - dt)
-            
-        timeout_like = (dropped > 0) and (full_timer >= rtt_sample) 
+
+        timeout_like = (dropped > 0) and (full_timer >= rtt_sample)
         dupack_like = (dropped > 0) and not timeout_like
-        
-        if algorithm == 'Reno':
+
+        if algo_id == ALGO_RENO:
             if timeout_like:
                 ssthresh = max(cwnd / 2.0, 2.0)
-                cwnd = 1.0 
-                phase = 'slow_start'
+                cwnd = 1.0
+                phase = PHASE_SS
                 in_fast_recovery = False
             elif dupack_like:
                 if not in_fast_recovery:
                     ssthresh = max(cwnd / 2.0, 2.0)
                     cwnd = ssthresh
                     in_fast_recovery = True
-                    phase = 'congestion_avoidance'
-            if phase == 'slow_start':
-                cwnd += acked 
+                    phase = PHASE_CA
+            if phase == PHASE_SS:
+                cwnd += acked
                 if cwnd >= ssthresh:
-                    phase = 'congestion_avoidance'
+                    phase = PHASE_CA
             else:
                 cwnd += (acked / max(cwnd, 1.0))
             if in_fast_recovery and acked > 0 and not dupack_like:
                 in_fast_recovery = False
-        
-        elif algorithm == 'Cubic':
+
+        elif algo_id == ALGO_CUBIC:
             if timeout_like or dupack_like:
                 W_max = cwnd
                 epoch_start = sim_time
@@ -122,82 +191,161 @@ def run_simulation(algorithm='Reno', bw_mbps=7.0, delay_ms=10.0, buffer_size=50,
                 ssthresh = cwnd
                 K = ((W_max * (1.0 - beta)) / C) ** (1.0 / 3.0) if W_max > 0 else 0.0
                 W_tcp = cwnd
-            if phase == 'slow_start':
+            if phase == PHASE_SS:
                 cwnd += acked
                 if cwnd >= ssthresh:
-                    phase = 'congestion_avoidance'
+                    phase = PHASE_CA
             else:
                 t = (sim_time + rtt_sample) - epoch_start
-                W_cubic = C * (t - K) ** 3 + W_max
+                dtk = t - K
+                W_cubic = C * dtk * dtk * dtk + W_max # cube via multiplies, not generic pow
                 W_tcp += (acked / max(W_tcp, 1.0))
                 if W_cubic < W_tcp:
                     cwnd = W_tcp
                 else:
                     cwnd_target = W_cubic
                     cwnd_diff = cwnd_target - cwnd
-                    cwnd += (cwnd_diff / max(1.0, cwnd)) * acked 
-        
-        elif algorithm == 'BBR':
-            bdp_pkts = (bw_mbps * 1e6 / (8.0 * MSS_BYTES)) * base_rtt
-            target_cwnd = max(4.0, 1.0 * bdp_pkts)
+                    cwnd += (cwnd_diff / max(1.0, cwnd)) * acked
+
+        elif algo_id == ALGO_BBR:
             if dropped > 0:
-                 cwnd = max(4.0, cwnd * 0.8) 
+                 cwnd = max(4.0, cwnd * 0.8)
             else:
-                 cwnd += 0.1 * (target_cwnd - cwnd)
-        
-        cwnd = max(cwnd, 1.0) 
-        
-        if i % int(0.1 / dt) == 0:
-            trace.append({
-                'time': round(sim_time, 3),
-                'cwnd': round(cwnd, 4),
-                'throughput': round(throughput, 4),
-                'buffer': buffer_current, 
-                'inflight': inflight,     
-                'phase': phase,
-                'sent': sent_total,        
-                'delivered': delivered_total,  
-                'dropped': dropped_total       
-            })
-    return trace
+                 cwnd += 0.1 * (target_cwnd_bbr - cwnd)
+
+        cwnd = max(cwnd, 1.0)
+
+        if sample_countdown == 0:
+            sample_countdown = sample_every
+            trace_time[s] = sim_time
+            trace_cwnd[s] = cwnd
+            trace_thrpt[s] = throughput
+            trace_buffer[s] = buffer_current
+            trace_inflight[s] = inflight
+            trace_phase[s] = phase
+            trace_sent[s] = sent_total
+            trace_delivered[s] = delivered_total
+            trace_dropped[s] = dropped_total
+            s += 1
+        sample_countdown -= 1
+
+    return (trace_time[:s], trace_cwnd[:s], trace_thrpt[:s], trace_buffer[:s],
+            trace_inflight[:s], trace_phase[:s], trace_sent[:s],
+            trace_delivered[:s], trace_dropped[:s])
+
+# warm the JIT at import with a throwaway run so the first /simulate request
+# does not pay the compile (cache=True makes this a disk-cache load after
+# the very first process ever runs it)
+_run_sim_core(ALGO_RENO, 5.0, 10.0, 10, 0.2, 1500.0)
+
+# trace row layout shared by the python and ns-3 engines
+_TRACE_KEYS = ('time', 'cwnd', 'throughput', 'buffer', 'inflight', 'phase',
+               'sent', 'delivered', 'dropped')
+
+# the sim is deterministic in its parameters, so repeated requests for the
+# same set (common while exploring in the UI) can reuse a cached result;
+# rows are cached as tuples and rehydrated to dicts per response so callers
+# never share mutable state
+@lru_cache(maxsize=256)
+def _run_sim_rows(algo_id, bw_mbps, delay_ms, buffer_size, duration, mss_bytes):
+    (trace_time, trace_cwnd, trace_thrpt, trace_buffer, trace_inflight,
+     trace_phase, trace_sent, trace_delivered, trace_dropped) = _run_sim_core(
+        algo_id, bw_mbps, delay_ms, buffer_size, duration, mss_bytes)
+
+    return tuple(
+        (
+            round(float(trace_time[j]), 3),
+            round(float(trace_cwnd[j]), 4),
+            round(float(trace_thrpt[j]), 4),
+            int(trace_buffer[j]),
+            int(trace_inflight[j]),
+            PHASE_NAMES[trace_phase[j]],
+            int(trace_sent[j]),
+            int(trace_delivered[j]),
+            int(trace_dropped[j])
+        )
+        for j in range(len(trace_time))
+    )
+
+# python simulation
+def run_simulation(algorithm='Reno', bw_mbps=7.0, delay_ms=10.0, buffer_size=50, duration=10.0, mss_bytes=1500):
+    algo_id = ALGO_IDS.get(algorithm, -1)
+    rows = _run_sim_rows(algo_id, float(bw_mbps), float(delay_ms),
+                         int(buffer_size), float(duration), float(mss_bytes))
+    return [dict(zip(_TRACE_KEYS, r)) for r in rows]
 
 # ns3 simulation (network simulator)
+def _ns3_frame_to_trace(df):
+    # one C-level pass over the ns-3 samples instead of per-row Python
+    # float() conversions and dict building
+    df = df.rename(columns={'cwnd_pkts': 'cwnd', 'throughput_mbps': 'throughput',
+                            'buffer_pkts': 'buffer', 'inflight_pkts': 'inflight'})
+    df = df[['time', 'cwnd', 'throughput', 'buffer', 'inflight']].astype(float)
+    df['phase'] = 'ns3'
+    df['sent'] = 0
+    df['delivered'] = 0
+    df['dropped'] = 0
+    return df.to_dict(orient='records')
+
+def _find_tcp_multi_binary(ns3_dir):
+    # locate the compiled scratch/tcp_multi binary so it can be executed
+    # directly; going through the ns3 wrapper re-parses CMake state and adds
+    # seconds of startup per request
+    pattern = os.path.join(ns3_dir, 'build', 'scratch', '*tcp_multi*')
+    for candidate in sorted(glob.glob(pattern)):
+        if os.path.isfile(candidate) and os.access(candidate, os.X_OK) and not candidate.endswith('.cc'):
+            return candidate
+    return None
+
 def run_simulation_ns3(algorithm='Reno', bw_mbps=7.0, delay_ms=10.0, buffer_size=50, duration=10.0, mss_bytes=1500):
     backend_dir = os.path.dirname(os.path.abspath(__file__))
     base_dir = os.path.abspath(os.path.join(backend_dir, '..'))
     ns3_dir = os.path.join(base_dir, 'ns3')
-    ns3_executable = os.path.join(ns3_dir, 'ns3') 
-    
+    ns3_executable = os.path.join(ns3_dir, 'ns3')
+
     if not os.path.exists(ns3_executable):
         print(f"ns-3 executable not found at {ns3_executable}")
         print("Please compile your ns-3 project first.")
         raise FileNotFoundError(f"ns-3 executable not found. Did you compile it? Looked for: {ns3_executable}")
 
     output_csv = os.path.join(ns3_dir, 'trace_flow0.csv')
-    
+
     if os.path.exists(output_csv):
         try:
             os.remove(output_csv)
         except OSError as e:
             print(f"Warning: Could not remove old trace file: {e}")
 
-    run_string = (
-        f'scratch/tcp_multi '
-        f'--flows={shlex.quote(algorithm)} '
-        f'--rate={shlex.quote(str(bw_mbps))}Mbps '
-        f'--delay={shlex.quote(str(delay_ms))}ms '
-        f'--bufferPkts={shlex.quote(str(int(buffer_size)))} '
-        f'--duration={shlex.quote(str(int(duration)))} '
-        f'--mss={shlex.quote(str(int(mss_bytes)))}'
-    )
+    sim_args = [
+        f'--flows={algorithm}',
+        f'--rate={bw_mbps}Mbps',
+        f'--delay={delay_ms}ms',
+        f'--bufferPkts={int(buffer_size)}',
+        f'--duration={int(duration)}',
+        f'--mss={int(mss_bytes)}',
+        '--stdout=1',
+    ]
 
-    command = [ns3_executable, 'run', run_string]
+    run_env = None
+    tcp_multi_bin = _find_tcp_multi_binary(ns3_dir)
+    if tcp_multi_bin:
+        # exec the binary directly, args passed as a list (no shell reparse);
+        # the ns-3 shared libs live in build/lib
+        command = [tcp_multi_bin] + sim_args
+        run_env = dict(os.environ)
+        lib_dir = os.path.join(ns3_dir, 'build', 'lib')
+        run_env['LD_LIBRARY_PATH'] = lib_dir + os.pathsep + run_env.get('LD_LIBRARY_PATH', '')
+    else:
+        # fall back to the wrapper when the build layout is unknown
+        run_string = 'scratch/tcp_multi ' + ' '.join(shlex.quote(a) for a in sim_args)
+        command = [ns3_executable, 'run', run_string]
     print(f"Running ns-3 command: {' '.join(command)}")
 
     try:
         proc = subprocess.run(
             command,
             cwd=ns3_dir,
+            env=run_env,
             capture_output=True,
             text=True,
             timeout=30,
@@ -212,35 +360,40 @@ def run_simulation_ns3(algorithm='Reno', bw_mbps=7.0, delay_ms=10.0, buffer_size
         print(f"An unknown error occurred while running ns-3: {e}")
         raise
 
+    # preferred path: samples streamed on stdout (no CSV file round-trip);
+    # anything the build wrapper prints before the header is skipped
+    stdout_header = 'flow,time,cwnd_pkts,throughput_mbps,buffer_pkts,inflight_pkts'
+    lines = (proc.stdout or '').splitlines()
+    if stdout_header in lines:
+        df = pd.read_csv(StringIO('\n'.join(lines[lines.index(stdout_header):])))
+        trace = _ns3_frame_to_trace(df[df['flow'] == 0])
+        print(f"Parsed {len(trace)} data points from ns-3 stdout.")
+        return trace
+
+    # fallback for binaries built before the --stdout flag existed
     if not os.path.exists(output_csv):
         print(f"ns-3 ran but did not create output file: {output_csv}")
         print("STDOUT:", proc.stdout)
         print("STDERR:", proc.stderr)
         raise FileNotFoundError("ns-3 ran but trace_flow0.csv was not created.")
 
-    trace = []
     try:
-        with open(output_csv, 'r') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                trace.append({
-                    'time': float(row['time']),
-                    'cwnd': float(row['cwnd_pkts']),
-                    'throughput': float(row['throughput_mbps']),
-                    'buffer': float(row['buffer_pkts']),
-                    'inflight': float(row['inflight_pkts']),
-                    'phase': 'ns3',
-                    'sent': 0,
-                    'delivered': 0,
-                    'dropped': 0
-                })
+        trace = _ns3_frame_to_trace(pd.read_csv(output_csv))
     except Exception as e:
         print(f"Error parsing ns-3 output file: {e}")
         raise
-        
+
     print(f"Parsed {len(trace)} data points from ns-3.")
     return trace
 
+# ns-3 runs are deterministic too, and avoiding a repeat subprocess is worth
+# far more than the python-engine cache; frozen rows for the same reason
+@lru_cache(maxsize=32)
+def _run_ns3_rows(algorithm, bw_mbps, delay_ms, buffer_size, duration, mss_bytes):
+    trace = run_simulation_ns3(algorithm, bw_mbps, delay_ms, buffer_size,
+                               duration, mss_bytes)
+    return tuple(tuple(row[k] for k in _TRACE_KEYS) for row in trace)
+
 # multi flow
 def simulate_flows(flows, links, paths, duration=20.0, dt=0.05, mss=1500):
     n_steps = max(1, int(round(duration / dt)))
@@ -251,199 +404,265 @@ def simulate_flows(flows, links, paths, duration=20.0, dt=0.05, mss=1500):
         l.setdefault('mss', mss)
         l['bytes_per_sec'] = float(l['bandwidth']) * 1e6 / 8.0
         l.setdefault('queue_bytes', 0.0)
-        l.setdefault('per_flow_queue', {})
         l.setdefault('_queue_history', [])
-    flow_to_links = {}
-    for f in flows:
-        fid = f.get('id') or f"{f.get('src','?')}-{f.get('dst','?')}"
-        flow_to_links[fid] = paths.get(fid, []) or []
-    state = {}
-    for f in flows:
-        fid = f.get('id') or f"{f.get('src','?')}-{f.get('dst','?')}"
+    # derive each flow's id exactly once; every later structure keyed by fid
+    # (paths, state rows, traces) reuses this list instead of re-deriving
+    fids = [f.get('id') or f"{f.get('src','?')}-{f.get('dst','?')}" for f in flows]
+    flow_to_links = {fid: (paths.get(fid, []) or []) for fid in fids}
+
+    # per-flow state lives in SoA arrays indexed by flow position, so each
+    # per-step update is one vectorized op over all flows instead of F dict
+    # lookups; flow_index maps fid -> row in the arrays
+    flow_ids = list(flow_to_links.keys())
+    flow_index = {fid: i for i, fid in enumerate(flow_ids)}
+    F = len(flow_ids)
+
+    base_rtt_s = np.empty(F)
+    base_rtt_steps = np.empty(F, dtype=np.int64)
+    bottleneck_bw_mbps = np.empty(F)
+    algo_id = np.empty(F, dtype=np.int8)
+    ring_lens = np.empty(F, dtype=np.int64)
+    # one pass over flows replaces the old per-flow next() scan; first-wins
+    # on duplicate ids, and flows without an explicit 'id' keep the historic
+    # Reno default (their synthesized fid never matched a config)
+    algo_by_fid = {}
+    for fl in flows:
+        if fl.get('id') is not None:
+            algo_by_fid.setdefault(fl['id'], (fl.get('algorithm') or 'Reno').lower())
+    for f, fid in zip(flows, fids):
+        i = flow_index[fid]
         path_links = flow_to_links.get(fid, [])
         total_delay_ms = sum(float(links[lk].get('delay', 15.0)) for lk in path_links)
-        base_rtt_s = max(0.001, (total_delay_ms * 2) / 1000.0)
-        base_rtt_steps = max(1, int(round(base_rtt_s / dt)))
-        bottleneck_bw_mbps = 1000.0
+        base_rtt_s[i] = max(0.001, (total_delay_ms * 2) / 1000.0)
+        base_rtt_steps[i] = max(1, int(round(base_rtt_s[i] / dt)))
+        bottleneck_bw_mbps[i] = 1000.0
         if path_links:
             try:
-                bottleneck_bw_mbps = min(float(links[lk]['bandwidth']) for lk in path_links)
+                bottleneck_bw_mbps[i] = min(float(links[lk]['bandwidth']) for lk in path_links)
             except KeyError as e:
                 print(f"Warning: Link key {e} not found for flow {fid}. Defaulting BW.")
-                bottleneck_bw_mbps = 1.0
-
-        state[fid] = {
-            'cwnd': 1.0, 'inflight': 0.0, 'throughput_Mbps': 0.0,
-            'sent': 0.0, 'delivered': 0.0, 'dropped_cum': 0.0,
-            'ack_schedule': [0.0] * (n_steps + 500), # Increased buffer
-            'base_rtt_s': base_rtt_s, 'base_rtt_steps': base_rtt_steps,
-            'bottleneck_bw_mbps': bottleneck_bw_mbps, 'ssthresh': 1e12,
-            'phase': 'slow_start', 'in_fast_recovery': False, 'full_timer': 0.0,
-            'W_max': 1.0, 'epoch_start': 0.0, 'K': 0.0, 'W_tcp': 1.0,
-            'C': 0.4, 'beta': 0.7,
-        }
-    traces = {fid: [] for fid in flow_to_links.keys()}
+                bottleneck_bw_mbps[i] = 1.0
+        algo = algo_by_fid.get(fid, 'reno')
+        algo_id[i] = {'reno': ALGO_RENO, 'cubic': ALGO_CUBIC, 'bbr': ALGO_BBR}.get(algo, -1)
+        # ack schedule ring sized to the worst-case RTT along the path
+        buf_delay_s = sum((float(links[lk].get('buffer', 20)) * mss) / links[lk]['bytes_per_sec']
+                          for lk in path_links if lk in links)
+        ring_lens[i] = 4 * (base_rtt_steps[i] + int(math.ceil(buf_delay_s / dt))) + 64
+
+    # flatten the (flow, link-on-its-path) pairs into edge arrays so the
+    # per-step queue bookkeeping becomes scatter/gather numpy ops instead of
+    # nested dict traversals; edges are flow-major, links of a flow in path
+    # order, so reduceat segments line up with group_starts
+    link_keys = list(links.keys())
+    link_index = {lk: j for j, lk in enumerate(link_keys)}
+    L = len(link_keys)
+    edge_flow_list = []
+    edge_link_list = []
+    has_missing_link = np.zeros(F, dtype=bool)  # a missing path link blocks the flow
+    has_path = np.zeros(F, dtype=bool)
+    for i, fid in enumerate(flow_ids):
+        has_path[i] = bool(flow_to_links[fid])
+        for lk in flow_to_links[fid]:
+            if lk in link_index:
+                edge_flow_list.append(i)
+                edge_link_list.append(link_index[lk])
+            else:
+                has_missing_link[i] = True
+    edge_flow = np.array(edge_flow_list, dtype=np.int64)
+    edge_link = np.array(edge_link_list, dtype=np.int64)
+    E = len(edge_flow)
+    pfq_edge = np.zeros(E)  # queued bytes per (flow, link) pair
+    edge_counts = np.bincount(edge_flow, minlength=F)
+    flows_with_edges = np.nonzero(edge_counts > 0)[0]
+    group_starts = np.concatenate(([0], np.cumsum(edge_counts)))[flows_with_edges]
+
+    capacity_l = np.array([links[lk]['bytes_per_sec'] for lk in link_keys]) * dt
+    link_pps_l = np.array([(links[lk]['bandwidth'] * 1e6) / (8.0 * mss) for lk in link_keys])
+    buffer_bytes_l = np.array([float(links[lk].get('buffer', 20)) * float(mss) for lk in link_keys])
+
+    # local bindings for the loops that stay in Python: dict/attribute
+    # lookups resolved once instead of per step
+    mss_f = float(mss)
+    link_dicts = [links[lk] for lk in link_keys]
+    # per-link queue history as one preallocated column per step; rounded
+    # into the debug lists once after the loop instead of per append
+    queue_history_pkts = np.zeros((L, n_steps + 1))
+    path_link_dicts = [[links[lk] for lk in flow_to_links[fid] if lk in links] for fid in flow_ids]
+
+    cwnd = np.ones(F)
+    inflight = np.zeros(F)
+    throughput_Mbps = np.zeros(F)
+    sent = np.zeros(F)
+    delivered = np.zeros(F)
+    dropped_cum = np.zeros(F)
+    ssthresh = np.full(F, 1e12)
+    phase = np.zeros(F, dtype=np.int8)  # PHASE_SS / PHASE_CA
+    in_fast_recovery = np.zeros(F, dtype=bool)
+    full_timer = np.zeros(F)
+    W_max = np.ones(F)
+    epoch_start = np.zeros(F)
+    K = np.zeros(F)
+    W_tcp = np.ones(F)
+    C = 0.4; beta = 0.7
+
+    # one shared ring length keeps the consume step a single column slice
+    ack_ring_len = int(ring_lens.max()) if F else 64
+    ack_ring = np.zeros((F, ack_ring_len))
+
+    traces = {fid: [] for fid in flow_ids}
+    sample_every = int(0.1 / dt)
+    sample_countdown = 0 # fires on step 0, then every sample_every steps
     t = 0.0
     for step in range(n_steps + 1):
         t = step * dt
-        sent_pkts_map = {}
-        for fid, path_links in flow_to_links.items():
-            st = state[fid]
-            paced_send = (st['cwnd'] / max(st['base_rtt_s'], 1e-9)) * dt
-            window_left = max(st['cwnd'] - st['inflight'], 0.0)
-            want_send_pkts = min(paced_send, window_left)
-            sent_pkts_map[fid] = want_send_pkts
-            st['sent'] += want_send_pkts
-            offered_bytes = want_send_pkts * float(mss)
-            for lk in path_links:
-                if lk not in links: continue # path link might not be in graph
-                link = links[lk]
-                pfq = link.setdefault('per_flow_queue', {})
-                pfq[fid] = pfq.get(fid, 0.0) + offered_bytes
-                link['queue_bytes'] = sum(pfq.values())
-        flow_dropped_this_step = {fid: 0.0 for fid in flow_to_links.keys()}
-        drained_pkts_map = {fid: 0.0 for fid in flow_to_links.keys()}
-        per_link_drained_by_flow = {}
-        per_link_queue_delay = {}
-        for lk, link in links.items():
-            capacity = link['bytes_per_sec'] * dt
-            pfq = link.setdefault('per_flow_queue', {})
-            total_present = sum(pfq.values())
-            per_link_drained_by_flow[lk] = {}
-            link_pps = (link['bandwidth'] * 1e6) / (8.0 * mss)
-            per_link_queue_delay[lk] = (total_present / mss) / max(link_pps, 1e-9)
-            if total_present <= 0.0:
-                link['_queue_history'].append(0.0)
-                continue
-            drained_bytes = min(total_present, capacity)
-            frac = drained_bytes / total_present if total_present > 0 else 0.0
-            for fid, b in list(pfq.items()):
-                drained_b = b * frac
-                per_link_drained_by_flow[lk][fid] = drained_b
-                pfq[fid] = max(0.0, pfq[fid] - drained_b)
-            remaining = sum(pfq.values())
-            buffer_bytes = float(link.get('buffer', 20)) * float(mss)
-            drop_bytes = max(0.0, remaining - buffer_bytes)
-            if drop_bytes > 0 and remaining > 0:
-                drop_frac = drop_bytes / remaining
-                for fid, b in list(pfq.items()):
-                    drop_for_fid = b * drop_frac
-                    pfq[fid] = max(0.0, pfq[fid] - drop_for_fid)
-                    dropped_pkts = drop_for_fid / float(mss)
-                    flow_dropped_this_step[fid] = flow_dropped_this_step.get(fid, 0.0) + dropped_pkts
-                    state[fid]['dropped_cum'] += dropped_pkts
-            link['queue_bytes'] = sum(pfq.values())
-            link['_queue_history'].append(round(link['queue_bytes'] / float(mss), 6))
-        for fid, path_links in flow_to_links.items():
-            if not path_links: continue
-            st = state[fid]
-            min_drained_bytes = float('inf')
-            current_queue_delay = 0.0
-            for lk in path_links:
-                if lk not in links: 
-                    min_drained_bytes = 0 # This link doesn't exist, flow is blocked
-                    continue
-                drained_for_flow_on_link = per_link_drained_by_flow.get(lk, {}).get(fid, 0.0)
-                min_drained_bytes = min(min_drained_bytes, drained_for_flow_on_link)
-                current_queue_delay += per_link_queue_delay.get(lk, 0.0)
-            drained_pkts = min_drained_bytes / float(mss)
-            st['delivered'] += drained_pkts
-            rtt_sample = st['base_rtt_s'] + current_queue_delay
-            current_rtt_steps = max(1, int(round(rtt_sample / dt)))
-            ack_step = step + current_rtt_steps
-            if ack_step < len(st['ack_schedule']):
-                st['ack_schedule'][ack_step] += drained_pkts
-            st['throughput_Mbps'] = (drained_pkts * mss * 8.0) / (dt * 1e6) if dt > 0 else 0.0
-        for fid, path_links in flow_to_links.items():
-            f_cfg = next((f for f in flows if f.get('id') == fid), {})
-            algo = (f_cfg.get('algorithm') or 'Reno').lower()
-            st = state[fid]
-            want_send_pkts = sent_pkts_map.get(fid, 0.0)
-            acked = st['ack_schedule'][step]
-            st['inflight'] = max(0.0, st['inflight'] + want_send_pkts - acked)
-            dropped_this = flow_dropped_this_step.get(fid, 0.0)
-            if dropped_this > 0.0: st['full_timer'] += dt
-            else: st['full_timer'] = max(0.0, st['full_timer'] - dt)
-            rtt_sample = st['base_rtt_s'] + (st['inflight'] / max(1.0, st['cwnd'])) * st['base_rtt_s']
-            timeout_like = (dropped_this > 0.0) and (st['full_timer'] >= rtt_sample) 
-            dupack_like = (dropped_this > 0.0) and not timeout_like
-            cwnd = st['cwnd']
-            ssthresh = st['ssthresh']
-            phase = st['phase']
-            in_fast_recovery = st['in_fast_recovery']
-            if algo == 'reno':
-                if timeout_like:
-                    ssthresh = max(cwnd / 2.0, 2.0)
-                    cwnd = 1.0
-                    phase = 'slow_start'
-                    in_fast_recovery = False
-                elif dupack_like:
-                    if not in_fast_recovery:
-                        ssthresh = max(cwnd / 2.0, 2.0)
-                        cwnd = ssthresh
-                        in_fast_recovery = True
-                        phase = 'congestion_avoidance'
-                if phase == 'slow_start':
-                    cwnd += acked
-                    if cwnd >= ssthresh: phase = 'congestion_avoidance'
-                else:
-                    cwnd += (acked / max(cwnd, 1.0))
-                if in_fast_recovery and acked > 0 and not dupack_like:
-                    in_fast_recovery = False
-            elif algo == 'cubic':
-                W_max = st['W_max']
-                epoch_start = st['epoch_start']
-                K = st['K']
-                W_tcp = st['W_tcp']
-                C = st['C']
-                beta = st['beta']
-                if timeout_like or dupack_like:
-                    W_max = cwnd
-                    epoch_start = t
-                    cwnd = max(cwnd * beta, 2.0)
-                    ssthresh = cwnd
-                    K = ((W_max * (1.0 - beta)) / C) ** (1.0 / 3.0) if W_max > 0 else 0.0
-                    W_tcp = cwnd
-                    phase = 'congestion_avoidance'
-                if phase == 'slow_start':
-                    cwnd += acked
-                    if cwnd >= ssthresh:
-                        phase = 'congestion_avoidance'
-                else:
-                    t_cubic = (t + rtt_sample) - epoch_start
-                    W_cubic = C * (t_cubic - K) ** 3 + W_max
-                    W_tcp += (acked / max(W_tcp, 1.0))
-                    if W_cubic < W_tcp: cwnd = W_tcp
-                    else:
-                        cwnd_target = W_cubic
-                        cwnd_diff = cwnd_target - cwnd
-                        if cwnd > 0: cwnd += (cwnd_diff / cwnd) * acked
-                        else: cwnd += cwnd_diff * acked
-                st['W_max'] = W_max
-                st['epoch_start'] = epoch_start
-                st['K'] = K
-                st['W_tcp'] = W_tcp
-            elif algo == 'bbr':
-                bdp_bytes = (st['bottleneck_bw_mbps'] * 1e6 / 8.0) * rtt_sample
-                target_cwnd = max(4.0, 1.0 * (bdp_bytes / mss)) # FIX: 1.0 BDP
-                if dropped_this > 0: cwnd = max(4.0, cwnd * 0.8)
-                else: cwnd += 0.1 * (target_cwnd - cwnd)
-            st['cwnd'] = max(cwnd, 1.0)
-            st['ssthresh'] = ssthresh
-            st['phase'] = phase
-            st['in_fast_recovery'] = in_fast_recovery
-            if step % int(0.1 / dt) == 0:
+        paced_send = (cwnd / np.maximum(base_rtt_s, 1e-9)) * dt
+        window_left = np.maximum(cwnd - inflight, 0.0)
+        want_send_pkts = np.minimum(paced_send, window_left)
+        sent += want_send_pkts
+        offered_bytes = want_send_pkts * mss_f
+        pfq_edge += offered_bytes[edge_flow]
+
+        # link draining: compute each link's drain/drop fractions as
+        # L-vectors, then apply them to the edge queues via gathers, with
+        # np.add.at scatters for the per-link byte totals
+        total_present = np.zeros(L)
+        np.add.at(total_present, edge_link, pfq_edge)
+        per_link_queue_delay_l = (total_present / mss) / np.maximum(link_pps_l, 1e-9)
+        drained_bytes_l = np.minimum(total_present, capacity_l)
+        frac_l = np.where(total_present > 0, drained_bytes_l / np.where(total_present > 0, total_present, 1.0), 0.0)
+        drained_e = pfq_edge * frac_l[edge_link]
+        pfq_edge = np.maximum(0.0, pfq_edge - drained_e)
+        remaining_l = np.zeros(L)
+        np.add.at(remaining_l, edge_link, pfq_edge)
+        drop_bytes_l = np.maximum(0.0, remaining_l - buffer_bytes_l)
+        flow_dropped_this_step = np.zeros(F)
+        if np.any(drop_bytes_l > 0.0):
+            drop_frac_l = np.where(remaining_l > 0, drop_bytes_l / np.where(remaining_l > 0, remaining_l, 1.0), 0.0)
+            drop_e = pfq_edge * drop_frac_l[edge_link]
+            pfq_edge = np.maximum(0.0, pfq_edge - drop_e)
+            np.add.at(flow_dropped_this_step, edge_flow, drop_e / mss_f)
+            dropped_cum += flow_dropped_this_step
+            link_queue_l = np.zeros(L)
+            np.add.at(link_queue_l, edge_link, pfq_edge)
+        else:
+            # nothing overflowed: the post-drop totals are the post-drain
+            # totals, so skip the drop pass and the re-scatter entirely
+            link_queue_l = remaining_l
+        queue_history_pkts[:, step] = np.where(total_present > 0.0, link_queue_l / mss_f, 0.0)
+
+        # per-flow bottleneck (min drain over the path) and summed queue
+        # delay, gathered from the flow-major edge segments
+        min_drained_bytes = np.full(F, np.inf)
+        qdelay_path = np.zeros(F)
+        if E:
+            min_drained_bytes[flows_with_edges] = np.minimum.reduceat(drained_e, group_starts)
+            qdelay_path[flows_with_edges] = np.add.reduceat(per_link_queue_delay_l[edge_link], group_starts)
+        min_drained_bytes = np.where(has_missing_link, 0.0, min_drained_bytes)
+        drained_pkts_f = np.where(has_path, min_drained_bytes / mss_f, 0.0)
+        delivered += drained_pkts_f
+        rtt_steps_f = np.maximum(1, np.round((base_rtt_s + qdelay_path) / dt).astype(np.int64))
+        dep = has_path & (rtt_steps_f < ack_ring_len)
+        if dep.any():
+            np.add.at(ack_ring, (np.nonzero(dep)[0], (step + rtt_steps_f[dep]) % ack_ring_len),
+                      drained_pkts_f[dep])
+        if dt > 0:
+            throughput_Mbps = np.where(has_path, (drained_pkts_f * mss * 8.0) / (dt * 1e6), throughput_Mbps)
+        else:
+            throughput_Mbps = np.where(has_path, 0.0, throughput_Mbps)
+
+        # congestion-control update, vectorized over flows with per-algorithm
+        # masks; each np.where line mirrors one assignment of the old scalar
+        # branchy version, in the same order
+        slot = step % ack_ring_len
+        acked = ack_ring[:, slot].copy()
+        ack_ring[:, slot] = 0.0  # slot is reused once the ring wraps
+        inflight = np.maximum(0.0, inflight + want_send_pkts - acked)
+        dropped_this = flow_dropped_this_step
+        loss = dropped_this > 0.0
+        full_timer = np.where(loss, full_timer + dt, np.maximum(0.0, full_timer - dt))
+        rtt_sample = base_rtt_s + (inflight / np.maximum(1.0, cwnd)) * base_rtt_s
+        timeout_like = loss & (full_timer >= rtt_sample)
+        dupack_like = loss & ~timeout_like
+
+        # Reno
+        r = algo_id == ALGO_RENO
+        m_to = r & timeout_like
+        ssthresh = np.where(m_to, np.maximum(cwnd / 2.0, 2.0), ssthresh)
+        cwnd = np.where(m_to, 1.0, cwnd)
+        phase = np.where(m_to, PHASE_SS, phase)
+        in_fast_recovery = in_fast_recovery & ~m_to
+        m_da = r & dupack_like & ~in_fast_recovery
+        ssthresh = np.where(m_da, np.maximum(cwnd / 2.0, 2.0), ssthresh)
+        cwnd = np.where(m_da, ssthresh, cwnd)
+        in_fast_recovery = in_fast_recovery | m_da
+        phase = np.where(m_da, PHASE_CA, phase)
+        m_ss = r & (phase == PHASE_SS)
+        cwnd = np.where(m_ss, cwnd + acked, cwnd)
+        phase = np.where(m_ss & (cwnd >= ssthresh), PHASE_CA, phase)
+        m_ca = r & ~m_ss
+        cwnd = np.where(m_ca, cwnd + acked / np.maximum(cwnd, 1.0), cwnd)
+        exit_fr = r & in_fast_recovery & (acked > 0) & ~dupack_like
+        in_fast_recovery = in_fast_recovery & ~exit_fr
+
+        # Cubic
+        c = algo_id == ALGO_CUBIC
+        m_loss = c & (timeout_like | dupack_like)
+        W_max = np.where(m_loss, cwnd, W_max)
+        epoch_start = np.where(m_loss, t, epoch_start)
+        cwnd = np.where(m_loss, np.maximum(cwnd * beta, 2.0), cwnd)
+        ssthresh = np.where(m_loss, cwnd, ssthresh)
+        K = np.where(m_loss,
+                     np.where(W_max > 0, ((W_max * (1.0 - beta)) / C) ** (1.0 / 3.0), 0.0),
+                     K)
+        W_tcp = np.where(m_loss, cwnd, W_tcp)
+        phase = np.where(m_loss, PHASE_CA, phase)
+        m_ss = c & (phase == PHASE_SS)
+        cwnd = np.where(m_ss, cwnd + acked, cwnd)
+        phase = np.where(m_ss & (cwnd >= ssthresh), PHASE_CA, phase)
+        m_ca = c & ~m_ss
+        t_cubic = (t + rtt_sample) - epoch_start
+        dtk = t_cubic - K
+        W_cubic = C * dtk * dtk * dtk + W_max # cube via multiplies, not generic pow
+        W_tcp = np.where(m_ca, W_tcp + acked / np.maximum(W_tcp, 1.0), W_tcp)
+        m_wt = m_ca & (W_cubic < W_tcp)
+        cwnd = np.where(m_wt, W_tcp, cwnd)
+        m_cc = m_ca & ~m_wt
+        cwnd_diff = W_cubic - cwnd
+        cwnd = np.where(m_cc,
+                        np.where(cwnd > 0, cwnd + (cwnd_diff / np.where(cwnd > 0, cwnd, 1.0)) * acked,
+                                 cwnd + cwnd_diff * acked),
+                        cwnd)
+
+        # BBR
+        b = algo_id == ALGO_BBR
+        bdp_bytes = (bottleneck_bw_mbps * 1e6 / 8.0) * rtt_sample
+        target_cwnd = np.maximum(4.0, 1.0 * (bdp_bytes / mss)) # FIX: 1.0 BDP
+        cwnd = np.where(b & loss, np.maximum(4.0, cwnd * 0.8), cwnd)
+        cwnd = np.where(b & ~loss, cwnd + 0.1 * (target_cwnd - cwnd), cwnd)
+
+        cwnd = np.maximum(cwnd, 1.0)
+
+        if sample_countdown == 0:
+            sample_countdown = sample_every
+            # queue_bytes on the link dicts only feeds the sampled 'buffer'
+            # field, so the dict writeback happens at the sample cadence
+            for j in range(L):
+                link_dicts[j]['queue_bytes'] = float(link_queue_l[j])
+            for i, fid in enumerate(flow_ids):
                 traces[fid].append({
-                    'time': round(t, 3), 'cwnd': round(st['cwnd'], 4),
-                    'throughput': round(st['throughput_Mbps'], 6),
-                    'buffer': round(sum(links[lk]['queue_bytes'] for lk in path_links if lk in links) / float(mss) if path_links else 0.0, 6),
-                    'sent': round(st.get('sent', 0.0), 6),
-                    'delivered': round(st.get('delivered', 0.0), 6),
-                    'dropped': round(dropped_this, 6),
-                    'dropped_cum': round(st.get('dropped_cum', 0.0), 6),
-                    'inflight': round(st.get('inflight', 0.0), 6),
-                    'phase': st.get('phase', '')
+                    'time': round(t, 3), 'cwnd': round(float(cwnd[i]), 4),
+                    'throughput': round(float(throughput_Mbps[i]), 6),
+                    'buffer': round(sum(l['queue_bytes'] for l in path_link_dicts[i]) / mss_f if has_path[i] else 0.0, 6),
+                    'sent': round(float(sent[i]), 6),
+                    'delivered': round(float(delivered[i]), 6),
+                    'dropped': round(float(dropped_this[i]), 6),
+                    'dropped_cum': round(float(dropped_cum[i]), 6),
+                    'inflight': round(float(inflight[i]), 6),
+                    'phase': PHASE_NAMES[phase[i]]
                 })
+        sample_countdown -= 1
+    for j in range(L):
+        link_dicts[j]['_queue_history'] = [round(x, 6) for x in queue_history_pkts[j].tolist()]
     debug_links = {}
     for lk, v in links.items():
         debug_links[lk] = {
@@ -526,28 +745,82 @@ def build_graph_from_topology(topology_name, default_link, senders, receivers):
 
 
 def link_cost_factory(links, alpha_delay=1.0, beta_inv_bw=50.0):
-    def cost(linkKey):
-        lk = links[linkKey]
-        delay = float(lk.get('delay', 15.0))
-        bw = float(lk.get('bandwidth', 1.0))
-        return alpha_delay * delay + beta_inv_bw * (1.0 / max(0.001, bw))
-    return cost
+    # link params are static within a request, so compute every cost once up
+    # front; dijkstra's hottest path then does a single dict lookup instead
+    # of two .get()s plus float conversions per edge relax
+    cost_by_link = {
+        k: alpha_delay * float(v.get('delay', 15.0)) + beta_inv_bw * (1.0 / max(0.001, float(v.get('bandwidth', 1.0))))
+        for k, v in links.items()
+    }
+    return cost_by_link.__getitem__
 
 # for finding the best path for the node to transfer the data to the receiver
 def dijkstra(graph, start, goal, cost_fn):
-    pq = [(0.0, start, [])]
-    best = {}
+    # heap entries are (cost, node) only; the path is reconstructed from
+    # parent pointers at the end instead of copying a list on every push
+    dist = {start: 0.0}
+    prev = {}
+    pq = [(0.0, start)]
     while pq:
-        c, node, path = heapq.heappop(pq)
+        c, node = heapq.heappop(pq)
         if node == goal:
-            return path + [node]
-        if node in best and best[node] <= c:
-            continue
-        best[node] = c
+            break
+        if c > dist.get(node, math.inf):
+            continue # stale heap entry
         for nbr, linkKey in graph.get(node, {}).items():
             nc = c + cost_fn(linkKey)
-            heapq.heappush(pq, (nc, nbr, path + [node]))
-    return None
+            if nc < dist.get(nbr, math.inf):
+                dist[nbr] = nc
+                prev[nbr] = node
+                heapq.heappush(pq, (nc, nbr))
+    if goal not in dist:
+        return None
+    path = [goal]
+    while path[-1] != start:
+        path.append(prev[path[-1]])
+    path.reverse()
+    return path
+
+def _routing_key(graph, links):
+    # canonical hashable snapshot of everything a shortest path depends on:
+    # the adjacency and the per-link cost inputs (bandwidth, delay)
+    graph_items = tuple(sorted((node, tuple(sorted(nbrs.items()))) for node, nbrs in graph.items()))
+    link_items = tuple(sorted((lk, float(v.get('bandwidth', 1.0)), float(v.get('delay', 15.0)))
+                              for lk, v in links.items()))
+    return (graph_items, link_items)
+
+# the canonical topologies are tiny and repeat across requests, so the full
+# path table is computed once per distinct (graph, costs) pair and reused;
+# one dijkstra per source covers every (src, dst) in the graph
+@lru_cache(maxsize=256)
+def _shortest_paths_cached(routing_key):
+    graph_items, link_items = routing_key
+    graph = {node: dict(nbrs) for node, nbrs in graph_items}
+    cost_fn = link_cost_factory({lk: {'bandwidth': bw, 'delay': dly} for lk, bw, dly in link_items})
+    table = {}
+    for src in graph:
+        dist = {src: 0.0}
+        prev = {}
+        pq = [(0.0, src)]
+        while pq:
+            c, node = heapq.heappop(pq)
+            if c > dist.get(node, math.inf):
+                continue # stale heap entry
+            # every node appears as an adjacency key here (add_link inserts
+            # both endpoints), so index directly instead of .get per pop
+            for nbr, linkKey in graph[node].items():
+                nc = c + cost_fn(linkKey)
+                if nc < dist.get(nbr, math.inf):
+                    dist[nbr] = nc
+                    prev[nbr] = node
+                    heapq.heappush(pq, (nc, nbr))
+        for dst in dist:
+            path = [dst]
+            while path[-1] != src:
+                path.append(prev[path[-1]])
+            path.reverse()
+            table[(src, dst)] = tuple(path)
+    return table
 
 def nodes_to_linkkeys(nodes_path, graph):
     if not nodes_path or len(nodes_path) < 2:
@@ -568,6 +841,15 @@ def nodes_to_linkkeys(nodes_path, graph):
 
 
 # endpoints to frontend
+def _json_response(obj, status=200):
+    # trace payloads are thousands of float fields; orjson encodes them in C
+    # instead of stdlib json's per-number Python formatting
+    if orjson is None:
+        return jsonify(obj), status
+    return Response(orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY),
+                    status=status, mimetype='application/json')
+
+
 @app.route('/health', methods=['GET'])
 def health():
     return jsonify({'status': 'ok', 'message': 'backend alive'})
@@ -592,17 +874,73 @@ def simulate():
     try:
         if engine == 'ns3':
             print("--- Running simulation with ns-3 ---")
-            trace = run_simulation_ns3(algo, bw, delay, buffer_size, duration, mss)
+            rows = _run_ns3_rows(algo, bw, delay, buffer_size, duration, mss)
+            trace = [dict(zip(_TRACE_KEYS, r)) for r in rows]
         else:
             print("--- Running simulation with Python ---")
-            trace = run_simulation(algo, bw, delay, buffer_size, duration, mss)
+            rows = _pooled_sim_rows(ALGO_IDS.get(algo, -1), float(bw), float(delay),
+                                    int(buffer_size), float(duration), float(mss))
+            trace = [dict(zip(_TRACE_KEYS, r)) for r in rows]
         
-        return jsonify({'success': True, 'trace': trace})
+        return _json_response({'success': True, 'trace': trace})
     
     except Exception as e:
         tb = traceback.format_exc()
         print(f"Simulation failed: {e}\n{tb}")
-        return jsonify({'success': False, 'error': f"Simulation Engine Error: {e}", 'traceback': tb}), 500
+        return _json_response({'success': False, 'error': f"Simulation Engine Error: {e}", 'traceback': tb}, 500)
+
+
+# pool for parameter sweeps; created on first use so plain single-sim
+# deployments never fork workers; the lock keeps two concurrent first
+# requests (the server is threaded) from each forking their own pool
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _executor
+
+# /simulate runs the sim in a pool worker so concurrent requests to the
+# threaded dev server use separate cores instead of serializing on the GIL;
+# the lru in front keeps repeat parameter sets from ever reaching the pool
+@lru_cache(maxsize=256)
+def _pooled_sim_rows(algo_id, bw_mbps, delay_ms, buffer_size, duration, mss_bytes):
+    return _get_executor().submit(
+        _run_sim_rows, algo_id, bw_mbps, delay_ms, buffer_size, duration, mss_bytes).result()
+
+
+@app.route('/simulate_batch', methods=['POST'])
+def simulate_batch():
+    # run a list of independent parameter sets in parallel across cores
+    try:
+        data = request.json or {}
+        jobs = []
+        for p in data.get('params', []) or []:
+            jobs.append({
+                'algorithm': p.get('algorithm', 'Reno'),
+                'bw_mbps': float(p.get('bandwidth', 5)),
+                'delay_ms': float(p.get('delay', 10)),
+                'buffer_size': int(p.get('buffer', 50)),
+                'duration': float(p.get('duration', 10)),
+                'mss_bytes': int(p.get('mss', 1500)),
+            })
+    except Exception as e:
+        print(f"Error parsing request: {e}")
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        futures = [_get_executor().submit(run_simulation, **job) for job in jobs]
+        # collect in submission order so traces line up with the request list
+        traces = [f.result() for f in futures]
+        return _json_response({'success': True, 'traces': traces})
+    except Exception as e:
+        tb = traceback.format_exc()
+        print(f"Batch simulation failed: {e}\n{tb}")
+        return _json_response({'success': False, 'error': f"Simulation Engine Error: {e}", 'traceback': tb}, 500)
 
 
 @app.route('/simulate_csv', methods=['POST'])
@@ -618,14 +956,22 @@ def simulate_csv():
     except Exception as e:
         return jsonify({'error': str(e)}), 400
     trace = run_simulation(algo, bw, delay, buffer_size, duration, mss)
-    output = BytesIO()
-    writer = csv.writer(output)
     header = ['time', 'cwnd', 'throughput', 'buffer', 'inflight', 'sent', 'delivered', 'dropped', 'phase']
-    writer.writerow(header)
-    for row in trace:
-        writer.writerow([row.get(h, '') for h in header])
-    csv_bytes = output.getvalue()
-    return Response(csv_bytes, mimetype='text/csv',
+
+    # stream the rows instead of buffering the whole CSV: the client starts
+    # receiving bytes immediately and peak memory stays at one row
+    def generate():
+        buf = StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(header)
+        yield buf.getvalue()
+        for row in trace:
+            buf.seek(0)
+            buf.truncate()
+            writer.writerow([row.get(h, '') for h in header])
+            yield buf.getvalue()
+
+    return Response(stream_with_context(generate()), mimetype='text/csv',
                     headers={"Content-disposition": f"attachment; filename=trace_{algo}.csv"})
 
 
@@ -664,9 +1010,16 @@ def simulate_multi():
                     elif k in ('buffer', 'mss'):
                         links[lk_name][k] = int(v)
 
-        cost_fn = link_cost_factory(links)
         paths = {}
 
+        # link costs are static within a request and the same topologies
+        # repeat across requests, so every (src, dst) lookup hits the
+        # cross-request path table instead of running dijkstra
+        path_table = _shortest_paths_cached(_routing_key(graph, links))
+        def cached_path(a, b):
+            path = path_table.get((a, b))
+            return list(path) if path else None
+
         # round robin for parallel routing (trial)
         if topology == 'parallel' and len(flows) > 0:
             print("[Router] Using special 'parallel' topology routing...")
@@ -681,8 +1034,8 @@ def simulate_multi():
                 manual_paths = []
             # find path
                 try:
-                    nodes_path_1_A = dijkstra(graph, src, 'R1', cost_fn)
-                    nodes_path_1_B = dijkstra(graph, 'R1', dst, cost_fn)
+                    nodes_path_1_A = cached_path(src, 'R1')
+                    nodes_path_1_B = cached_path('R1', dst)
                     if nodes_path_1_A and nodes_path_1_B:
                         full_path_1_nodes = nodes_path_1_A + nodes_path_1_B[1:]
                         path1_links = nodes_to_linkkeys(full_path_1_nodes, graph)
@@ -693,8 +1046,8 @@ def simulate_multi():
                     print(f"Could not find path {src}->{dst} via R1: {e}")
 
                 try:
-                    nodes_path_2_A = dijkstra(graph, src, 'R2', cost_fn)
-                    nodes_path_2_B = dijkGistra(graph, 'R2', dst, cost_fn)
+                    nodes_path_2_A = cached_path(src, 'R2')
+                    nodes_path_2_B = cached_path('R2', dst)
                     if nodes_path_2_A and nodes_path_2_B:
                         full_path_2_nodes = nodes_path_2_A + nodes_path_2_B[1:]
                         path2_links = nodes_to_linkkeys(full_path_2_nodes, graph)
@@ -714,7 +1067,7 @@ def simulate_multi():
                 
                 if not available_paths:
                     print(f"[Router] Warning: Could not find manual paths for {src}->{dst}. Falling back to dijkstra for flow {fid}.")
-                    nodes_path = dijkstra(graph, src, dst, cost_fn)
+                    nodes_path = cached_path(src, dst)
                     paths[fid] = nodes_to_linkkeys(nodes_path, graph) or []
                 else:
                     pair_key = (src, dst)
@@ -733,7 +1086,7 @@ def simulate_multi():
                 if not src or not dst:
                     paths[fid] = []
                     continue
-                nodes_path = dijkstra(graph, src, dst, cost_fn)
+                nodes_path = cached_path(src, dst)
                 if not nodes_path:
                     print(f"ERROR: No path found for {fid} from {src} to {dst}")
                     paths[fid] = []
@@ -751,13 +1104,22 @@ def simulate_multi():
 
         debug_info = {'links': debug_links, 'paths': paths, 'graph_nodes': list(graph.keys())}
 
-        return jsonify({'success': True, 'traces': traces, 'debug': debug_info}), 200
+        return _json_response({'success': True, 'traces': traces, 'debug': debug_info})
 
     except Exception as e:
         tb = traceback.format_exc()
         print("simulate_multi ERROR:\n", tb)
-        return jsonify({'success': False, 'error': str(e), 'traceback': tb, 'request_body': body}), 500
+        return _json_response({'success': False, 'error': str(e), 'traceback': tb, 'request_body': body}, 500)
 
 
 if __name__ == '__main__':
-    app.run(host='localhost', port=5001, debug=True)
\ No newline at end of file
+    # reloader/debugger only when explicitly requested; threaded so one slow
+    # request doesn't serialize the rest (the CPU-heavy sims already run in
+    # the process pool). For production use gunicorn instead:
+    #   gunicorn -w $(nproc) -k gthread --threads 4 -b 0.0.0.0:5001 app:app
+    debug = os.getenv('FLASK_DEBUG', '0') == '1'
+    if not debug:
+        # werkzeug's per-request log line is surprisingly costly on the
+        # chatty polling endpoints
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    app.run(host='localhost', port=5001, debug=debug, threaded=True)
\ No newline at end of file
@@ -1,6 +1,8 @@
 import math
 from collections import defaultdict
 
+import numpy as np
+
 def simulate_flows(flows, links, paths, duration=20.0, dt=0.1, mss=1500):
     # normalize link fields and compute bytes_per_sec capacity
     for lk, l in links.items():
@@ -10,91 +12,127 @@ def simulate_flows(flows, links, paths, duration=20.0, dt=0.1, mss=1500):
         l.setdefault('mss', mss)
         l['bytes_per_sec'] = float(l['bandwidth']) * 1e6 / 8.0
 
-    # initialize state per flow
-    state = {}
-    for f in flows:
-        fid = f.get('id') or f"{f.get('src','N0')}-{f.get('dst','N1')}"
-        state[fid] = {
-            'cwnd': 1.0,
-            'inflight': 0.0,
-            'throughput_Mbps': 0.0,
-        }
+    # per-flow state as struct-of-arrays indexed by flow position, so the
+    # per-step congestion-control updates run as a few vectorized ops over
+    # all flows instead of a Python loop of dict mutations
+    N = len(flows)
+    flow_ids = []
+    algo_ids = np.empty(N, dtype=np.int8)  # 0=reno, 1=cubic, 2=bbr
+    for i, f in enumerate(flows):
+        flow_ids.append(f.get('id') or f"{f.get('src','N0')}-{f.get('dst','N1')}")
+        algo = f.get('algorithm', 'reno').lower()
+        algo_ids[i] = {'reno': 0, 'cubic': 1}.get(algo, 2)
+
+    cwnd = np.ones(N)
+    inflight = np.zeros(N)
+    throughput_Mbps = np.zeros(N)
+    want_send = np.zeros(N, dtype=np.int64)
+    delivered = np.zeros(N, dtype=np.int64)
 
     # precompute which flows share each link
     link_to_flows = defaultdict(list)
-    for f in flows:
-        fid = f.get('id') or f"{f.get('src','N0')}-{f.get('dst','N1')}"
+    for i, fid in enumerate(flow_ids):
         for lk in paths.get(fid, []):
             link_to_flows[lk].append(fid)
 
-    traces = { (f.get('id') or f"{f.get('src','N0')}-{f.get('dst','N1')}"): [] for f in flows }
+    # index the links once so the allocator below works on arrays rather
+    # than rebuilding a key->bytes dict every step
+    link_keys = list(links.keys())
+    link_index = {lk: j for j, lk in enumerate(link_keys)}
+    per_step_bytes = np.array([links[lk]['bytes_per_sec'] * dt for lk in link_keys])
+    flows_on_link = np.array([max(1, len(link_to_flows.get(lk, []))) for lk in link_keys],
+                             dtype=np.int64)
+    link_mss = np.array([max(1, links[lk].get('mss', mss)) for lk in link_keys],
+                        dtype=np.int64)
+    path_idx = [np.array([link_index[lk] for lk in paths.get(fid, [])], dtype=np.int64)
+                for fid in flow_ids]
+
+    # a flow that is the sole claimant of every link on its path always sees
+    # the full per-step share, so its path bottleneck (in packets) is a
+    # per-request constant and the allocator can skip its links entirely
+    exclusive = np.zeros(N, dtype=bool)
+    path_cap_pkts = np.zeros(N, dtype=np.int64)
+    for i, fid in enumerate(flow_ids):
+        idxs = path_idx[i]
+        if idxs.size and all(len(link_to_flows[link_keys[j]]) == 1 for j in idxs):
+            exclusive[i] = True
+            path_cap_pkts[i] = min(int((per_step_bytes[j] / flows_on_link[j]) / link_mss[j])
+                                   for j in idxs)
+
+    # BBR's target window only depends on the (static) path, so derive it
+    # once per flow instead of every step
+    bbr_target = np.ones(N)
+    for i, fid in enumerate(flow_ids):
+        rtt_s = 0.05
+        if paths.get(fid):
+            total_delay_ms = sum(links[lk].get('delay', 15.0) for lk in paths[fid])
+            rtt_s = max(0.001, (total_delay_ms * 2) / 1000.0)
+        if paths.get(fid):
+            bps = min(links[lk].get('bandwidth', 1.0) for lk in paths[fid]) * 1e6
+        else:
+            bps = 1e6
+        bdp_bytes = bps * rtt_s
+        bbr_target[i] = max(1.0, bdp_bytes / mss)
+
+    traces = {fid: [] for fid in flow_ids}
+
+    # the reno/cubic branches differ only in their constants, so table-drive
+    # them (indexed by algorithm code) and gather per-flow vectors once; BBR
+    # keeps its own target-tracking update
+    inc_step = np.array([0.2, 0.5, 0.0])[algo_ids]
+    dec_mult = np.array([0.7, 0.75, 1.0])[algo_ids]
+    grow_cap = np.array([1000.0, 2000.0, np.inf])[algo_ids]
+    m_aimd = algo_ids != 2
+    m_bbr = ~m_aimd
 
     t = 0.0
     while t <= duration + 1e-9:
-        # for each link compute available bytes this dt
-        link_available_bytes = {}
-        for lk, l in links.items():
-            link_available_bytes[lk] = l['bytes_per_sec'] * dt
-
-        # for each flow decide sends and deliveries
-        for f in flows:
-            fid = f.get('id') or f"{f.get('src','N0')}-{f.get('dst','N1')}"
-            algo = f.get('algorithm', 'reno').lower()
-            st = state[fid]
-
-            want_send = max(0, int(max(0.0, st['cwnd'] - st['inflight'])))
-            path_links = paths.get(fid, [])
-            if not path_links:
-                delivered_pkts = 0
-            else:
-                deliverable_pkts_per_link = []
-                for lk in path_links:
-                    avail_bytes = link_available_bytes.get(lk, 0.0)
-                    num_flows_on_link = max(1, len(link_to_flows.get(lk, [])))
-                    share_bytes = avail_bytes / num_flows_on_link
-                    link_mss = links[lk].get('mss', mss)
-                    deliverable_pkts_per_link.append(int(share_bytes / max(1, link_mss)))
-                delivered_pkts = min(want_send, min(deliverable_pkts_per_link) if deliverable_pkts_per_link else 0)
-
-                used_bytes = delivered_pkts * mss
-                for lk in path_links:
-                    link_available_bytes[lk] = max(0.0, link_available_bytes[lk] - used_bytes)
-
-            # update inflight
-            st['inflight'] = max(0.0, st['inflight'] + want_send - delivered_pkts)
-            # throughput in Mbps
-            st['throughput_Mbps'] = (delivered_pkts * mss * 8.0) / (dt * 1e6) if dt > 0 else 0.0
-
-            # algorithms
-            if algo == 'reno':
-                if delivered_pkts >= want_send and st['cwnd'] < 1000:
-                    st['cwnd'] += 0.2
-                else:
-                    st['cwnd'] = max(1.0, st['cwnd'] * 0.7)
-            elif algo == 'cubic':
-                if delivered_pkts >= want_send and st['cwnd'] < 2000:
-                    st['cwnd'] += 0.5
-                else:
-                    st['cwnd'] = max(1.0, st['cwnd'] * 0.75)
-            else:  # bbr
-                rtt_s = 0.05
-                if paths.get(fid):
-                    total_delay_ms = sum(links[lk].get('delay', 15.0) for lk in paths[fid])
-                    rtt_s = max(0.001, (total_delay_ms * 2) / 1000.0)
-                if paths.get(fid):
-                    bps = min(links[lk].get('bandwidth', 1.0) for lk in paths[fid]) * 1e6
-                else:
-                    bps = 1e6
-                bdp_bytes = bps * rtt_s
-                target_pkts = max(1.0, bdp_bytes / mss)
-                st['cwnd'] += 0.2 * (target_pkts - st['cwnd'])
-
-            st['cwnd'] = max(0.1, st['cwnd'])
+        want_send[:] = np.floor(np.maximum(cwnd - inflight, 0.0))
+
+        # bytes available on each link this dt; flows claim their fair share
+        # in list order, so this allocation pass stays sequential (earlier
+        # flows see more headroom, exactly as before)
+        link_available_bytes = per_step_bytes.copy()
+        for i in range(N):
+            idxs = path_idx[i]
+            if idxs.size == 0 or want_send[i] == 0:
+                # idle flows (inflight >= cwnd) can't deliver anything and
+                # draw down nothing, so skip their links entirely
+                delivered[i] = 0
+                continue
+            if exclusive[i]:
+                # nobody else reads these links, so no need to draw down
+                # their available bytes either
+                delivered[i] = min(want_send[i], path_cap_pkts[i])
+                continue
+            deliverable = want_send[i]
+            for j in idxs:
+                share_bytes = link_available_bytes[j] / flows_on_link[j]
+                deliverable = min(deliverable, int(share_bytes / link_mss[j]))
+            delivered[i] = deliverable
+            used_bytes = deliverable * mss
+            for j in idxs:
+                link_available_bytes[j] = max(0.0, link_available_bytes[j] - used_bytes)
+
+        # update inflight and throughput in Mbps
+        inflight = np.maximum(0.0, inflight + want_send - delivered)
+        throughput_Mbps = (delivered * mss * 8.0) / (dt * 1e6) if dt > 0 else np.zeros(N)
+
+        # algorithms: one table-driven pass over the additive-increase pair,
+        # then BBR's target tracking
+        filled = delivered >= want_send
+        grow = m_aimd & filled & (cwnd < grow_cap)
+        cwnd = np.where(grow, cwnd + inc_step, cwnd)
+        cwnd = np.where(m_aimd & ~grow, np.maximum(1.0, cwnd * dec_mult), cwnd)
+        cwnd = np.where(m_bbr, cwnd + 0.2 * (bbr_target - cwnd), cwnd)
+
+        cwnd = np.maximum(0.1, cwnd)
 
+        for i, fid in enumerate(flow_ids):
             traces[fid].append({
                 'time': round(t, 3),
-                'cwnd': round(st['cwnd'], 3),
-                'throughput': round(st['throughput_Mbps'], 3),
+                'cwnd': round(float(cwnd[i]), 3),
+                'throughput': round(float(throughput_Mbps[i]), 3),
                 'buffer': 0
             })
 
@@ -1,4 +1,6 @@
 import heapq
+import math
+from functools import lru_cache
 
 def build_topology_graph(topology_name, default_link):
     # build graphs in the multi flow tab
@@ -7,8 +9,9 @@ def build_topology_graph(topology_name, default_link):
 
     def add_link(a, b, params=None):
         key = f"{a}-{b}"
-        params = dict(params or default_link)
-        links[key] = dict(params)
+        # one copy per link, not two; each link still gets its own dict
+        # because the simulator mutates per-link state (queue bytes etc.)
+        links[key] = dict(params or default_link)
         graph.setdefault(a, {})[b] = key
         graph.setdefault(b, {})[a] = key
 
@@ -42,51 +45,99 @@ def build_topology_graph(topology_name, default_link):
 
 def link_cost_fn_factory(links, alpha_delay=1.0, beta_inv_bw=100.0):
     # cost = alpha * delay_ms + beta * (1 / bandwidth_Mbps)
-    def cost_func(linkKey):
-        lk = links[linkKey]
-        delay = float(lk.get('delay', 15.0))
-        bw = float(lk.get('bandwidth', 1.0))
-        return alpha_delay * delay + beta_inv_bw * (1.0 / max(0.001, bw))
-    return cost_func
+    # link params are static for the duration of a routing call, so compute
+    # every cost once up front; each relaxation then costs one dict lookup
+    # instead of two .get()s, two float() conversions and a division
+    cost_by_link = {
+        k: alpha_delay * float(v.get('delay', 15.0)) + beta_inv_bw * (1.0 / max(0.001, float(v.get('bandwidth', 1.0))))
+        for k, v in links.items()
+    }
+    return cost_by_link.__getitem__
 
 def dijkstra_path(graph, start, goal, cost_fn):
-    pq = [(0.0, start, [])]
-    best = {}
+    # heap entries are (cost, node) only; the path comes from parent
+    # pointers at the end instead of copying a list on every push
+    dist = {start: 0.0}
+    prev = {}
+    pq = [(0.0, start)]
     while pq:
-        cost, node, path = heapq.heappop(pq)
+        cost, node = heapq.heappop(pq)
         if node == goal:
-            return path + [node]
-        if node in best and best[node] <= cost:
-            continue
-        best[node] = cost
+            break
+        if cost > dist.get(node, math.inf):
+            continue  # stale heap entry
         for nbr, linkKey in graph.get(node, {}).items():
             new_cost = cost + cost_fn(linkKey)
-            heapq.heappush(pq, (new_cost, nbr, path + [node]))
-    return None
+            if new_cost < dist.get(nbr, math.inf):
+                dist[nbr] = new_cost
+                prev[nbr] = node
+                heapq.heappush(pq, (new_cost, nbr))
+    if goal not in dist:
+        return None
+    path = [goal]
+    while path[-1] != start:
+        path.append(prev[path[-1]])
+    path.reverse()
+    return path
+
+def _routing_key(graph, links):
+    # hashable snapshot of the adjacency plus the per-link cost inputs
+    graph_items = tuple(sorted((node, tuple(sorted(nbrs.items()))) for node, nbrs in graph.items()))
+    link_items = tuple(sorted((lk, float(v.get('bandwidth', 1.0)), float(v.get('delay', 15.0)))
+                              for lk, v in links.items()))
+    return (graph_items, link_items)
+
+# the topologies are tiny and repeat across calls, so the full path table is
+# computed once per distinct (graph, costs) pair: one dijkstra per source
+# covers every (src, dst) pair
+@lru_cache(maxsize=128)
+def _all_pairs_paths(routing_key):
+    graph_items, link_items = routing_key
+    graph = {node: dict(nbrs) for node, nbrs in graph_items}
+    cost_fn = link_cost_fn_factory({lk: {'bandwidth': bw, 'delay': dly} for lk, bw, dly in link_items})
+    table = {}
+    for src in graph:
+        dist = {src: 0.0}
+        prev = {}
+        pq = [(0.0, src)]
+        while pq:
+            cost, node = heapq.heappop(pq)
+            if cost > dist.get(node, math.inf):
+                continue  # stale heap entry
+            for nbr, linkKey in graph.get(node, {}).items():
+                new_cost = cost + cost_fn(linkKey)
+                if new_cost < dist.get(nbr, math.inf):
+                    dist[nbr] = new_cost
+                    prev[nbr] = node
+                    heapq.heappush(pq, (new_cost, nbr))
+        for dst in dist:
+            path = [dst]
+            while path[-1] != src:
+                path.append(prev[path[-1]])
+            path.reverse()
+            table[(src, dst)] = tuple(path)
+    return table
 
 def path_nodes_to_linkkeys(path_nodes, graph):
-    link_keys = []
     if not path_nodes or len(path_nodes) < 2:
-        return link_keys
-    for i in range(len(path_nodes) - 1):
-        a = path_nodes[i]; b = path_nodes[i+1]
-        lk = graph[a].get(b)
-        if not lk:
-            return None
-        link_keys.append(lk)
-    return link_keys
+        return []
+    try:
+        return [graph[a][b] for a, b in zip(path_nodes, path_nodes[1:])]
+    except KeyError:
+        # an edge on the path is missing from the graph
+        return None
 
 def choose_paths_for_flows(graph, links, flows):
-    cost_fn = link_cost_fn_factory(links)
+    path_table = _all_pairs_paths(_routing_key(graph, links))
     paths = {}
     for f in flows:
         fid = f.get('id') or f"{f.get('src','N0')}-{f.get('dst','N1')}"
         src = f.get('src', 'N0')
         dst = f.get('dst', 'N1')
-        node_path = dijkstra_path(graph, src, dst, cost_fn)
+        node_path = path_table.get((src, dst))
         if node_path is None:
             paths[fid] = []
             continue
-        linkkeys = path_nodes_to_linkkeys(node_path, graph) or []
+        linkkeys = path_nodes_to_linkkeys(list(node_path), graph) or []
         paths[fid] = linkkeys
     return paths